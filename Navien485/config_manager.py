@@ -1,8 +1,25 @@
 import json
+import logging
+import os
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from logger import setup_logger
 
 
+@lru_cache(maxsize=32)
+def _load_json_cached(path: str, mtime: float) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_json(path: str) -> Dict[str, Any]:
+    """Load a JSON file, reusing the parsed result until its mtime changes.
+
+    The returned dict is shared between callers and must not be mutated.
+    """
+    return _load_json_cached(path, os.path.getmtime(path))
+
+
 class ConfigManager:
     """Configuration management for Navien RS485 MQTT bridge."""
     
@@ -15,20 +32,19 @@ class ConfigManager:
     def load_config(self) -> None:
         """Load configuration from JSON file."""
         try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                self._config = json.load(f)
+            self._config = load_json(self.config_path)
             
             # 설정 형식 확인 및 로깅
             if "options" in self._config:
-                self.logger.info(f"Home Assistant 애드온 형식 설정 로드: {self.config_path}")
+                self.logger.info("Home Assistant 애드온 형식 설정 로드: %s", self.config_path)
             else:
-                self.logger.info(f"직접 설정 형식 로드: {self.config_path}")
+                self.logger.info("직접 설정 형식 로드: %s", self.config_path)
                 
         except FileNotFoundError:
-            self.logger.error(f"설정 파일({self.config_path})을 찾을 수 없습니다.")
+            self.logger.error("설정 파일(%s)을 찾을 수 없습니다.", self.config_path)
             self._config = {}
         except json.JSONDecodeError:
-            self.logger.error(f"설정 파일({self.config_path})의 JSON 형식이 올바르지 않습니다.")
+            self.logger.error("설정 파일(%s)의 JSON 형식이 올바르지 않습니다.", self.config_path)
             self._config = {}
     
     @property
@@ -88,12 +104,12 @@ class ConfigManager:
     
     def print_config(self) -> None:
         """Print current configuration values."""
-        if self.validate_config():
+        if self.validate_config() and self.logger.isEnabledFor(logging.INFO):
             self.logger.info("--- MQTT 설정 값 ---")
-            self.logger.info(f"MQTT_USERNAME: {self.mqtt_username}")
-            self.logger.info(f"MQTT_PASSWORD: {'*' * len(self.mqtt_password) if self.mqtt_password else ''}")
-            self.logger.info(f"MQTT_SERVER: {self.mqtt_server}")
-            self.logger.info(f"MQTT_PORT: {self.mqtt_port}")
+            self.logger.info("MQTT_USERNAME: %s", self.mqtt_username)
+            self.logger.info("MQTT_PASSWORD: %s", '*' * len(self.mqtt_password or ''))
+            self.logger.info("MQTT_SERVER: %s", self.mqtt_server)
+            self.logger.info("MQTT_PORT: %s", self.mqtt_port)
             self.logger.info("--- TOPIC 설정 값 ---")
-            self.logger.info(f"ROOT_TOPIC_NAME: {self.root_topic}")
-            self.logger.info(f"HOMEASSISTANT_ROOT_TOPIC_NAME: {self.homeassistant_root_topic}")
\ No newline at end of file
+            self.logger.info("ROOT_TOPIC_NAME: %s", self.root_topic)
+            self.logger.info("HOMEASSISTANT_ROOT_TOPIC_NAME: %s", self.homeassistant_root_topic)
\ No newline at end of file
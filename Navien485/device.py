@@ -1,9 +1,10 @@
 import re
 import json
 from typing import Dict, List, Any, Callable, Optional, Tuple
-from collections import defaultdict
 from json import dumps as json_dumps
 
+from protocol_utils import ProtocolUtils
+
 
 class Device:
     """Represents a smart home device connected via RS485."""
@@ -16,7 +17,8 @@ class Device:
         device_class: str,
         child_devices: List[str] = None,
         mqtt_discovery: bool = True,
-        optional_info: Dict[str, Any] = None
+        optional_info: Dict[str, Any] = None,
+        root_topic: str = "rs485_mqtt"
     ):
         self.device_name = device_name
         self.device_id = device_id
@@ -24,11 +26,23 @@ class Device:
         self.device_unique_id = f'rs485_{self.device_id}_{self.device_subid}'
         self.device_class = device_class
         self.child_devices = child_devices or []
+        # 이름이 중복되면 첫 번째 인덱스 사용 (기존 list.index()와 동일)
+        self._child_name_to_idx: Dict[str, int] = {}
+        for idx, child in enumerate(self.child_devices):
+            self._child_name_to_idx.setdefault(child + device_name, idx)
         self.mqtt_discovery = mqtt_discovery
         self.optional_info = optional_info or {}
+        # 상태 토픽과 명령 프레임은 등록 시점에 이 루트 토픽으로 미리 계산
+        self.root_topic = root_topic
+        self._child_masks = tuple(1 << index for index in range(len(self.child_devices)))
         
-        self.status_messages: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.status_messages: Dict[str, List[Dict[str, Any]]] = {}
         self.command_messages: Dict[str, Dict[str, Any]] = {}
+        
+        # Discovery payloads are static once registration is done; keep the
+        # last result keyed by the topics it was built for.
+        self._discovery_cache: Optional[List[Tuple[str, str]]] = None
+        self._discovery_cache_key: Optional[Tuple[str, str]] = None
 
     def register_status(
         self,
@@ -40,14 +54,33 @@ class Device:
         process_func: Callable[[str], Any] = lambda v: v
     ) -> None:
         """Register a status message handler for this device."""
+        self.register_status_for_flags(
+            [message_flag], attr_name, regex, topic_class, device_name, process_func
+        )
+
+    def register_status_for_flags(
+        self,
+        message_flags: List[str],
+        attr_name: str,
+        regex: str,
+        topic_class: str,
+        device_name: Optional[str] = None,
+        process_func: Callable[[str], Any] = lambda v: v
+    ) -> None:
+        """Register one status message handler shared by several message flags."""
         device_name = device_name or self.device_name
-        self.status_messages[message_flag].append({
+        status = {
             'regex': regex,
+            'pattern': re.compile(regex),
             'process_func': process_func,
             'device_name': device_name,
             'attr_name': attr_name,
             'topic_class': topic_class
-        })
+        }
+        for message_flag in message_flags:
+            self.status_messages.setdefault(message_flag, []).append(status)
+        self._prepare_status(status)
+        self._discovery_cache = None
 
     def register_command(
         self,
@@ -58,40 +91,85 @@ class Device:
         process_func: Callable[[str], str] = lambda v: v
     ) -> None:
         """Register a command message handler for this device."""
-        self.command_messages[attr_name] = {
+        command = {
             'message_flag': message_flag,
             'attr_name': attr_name,
             'topic_class': topic_class,
             'process_func': process_func,
             'controll_id': controll_id
         }
+        self.command_messages[attr_name] = command
+        self._prepare_command(command)
+        self._discovery_cache = None
+
+    def _prepare_status(self, status: Dict[str, Any]) -> None:
+        """Precompute the topics and climate bit-field flag used by ``parse_payload``."""
+        status['topics'] = [
+            f"{self.root_topic}/{self.device_class}/{child_device}{self.device_name}/{status['attr_name']}"
+            for child_device in (self.child_devices or [""])
+        ]
+        # Special handling for climate power and away_mode with bit operations
+        status['is_climate_bitfield'] = (
+            len(self.child_devices) > 0 and
+            status['attr_name'] in ["power", "away_mode"] and
+            self.device_class == "climate"
+        )
+        if status['is_climate_bitfield']:
+            # 비트 값은 0 또는 mask 뿐이므로 자식별 (꺼짐, 켜짐) 결과를 미리 계산
+            process_func = status['process_func']
+            status['bit_values'] = [
+                (process_func(0), process_func(mask)) for mask in self._child_masks
+            ]
+
+    def _prepare_command(self, command: Dict[str, Any]) -> None:
+        """Precompute frame headers and pick the builder for a command.
+
+        ``headers`` holds one child frame header per control ID; ``build`` is
+        the builder used when no child name is given.
+        """
+        device_id = int(self.device_id, 16)
+        device_subid = int(self.device_subid, 16)
+        message_flag = int(command['message_flag'], 16)
+        
+        command['headers'] = [
+            bytes((0xf7, device_id, int(controll_id, 16), message_flag, 0x01))
+            for controll_id in (command['controll_id'] or [])
+        ]
+        # Special handling for elevator
+        if self.device_id == '33' and command['message_flag'] == '81':
+            command['header'] = bytes((0xf7, device_id, device_subid, message_flag, 0x03, 0x00))
+            command['build'] = self._build_elevator_command
+        # 환풍기 percentage 명령은 특별한 형식 사용
+        elif self.device_id == '32' and command['message_flag'] == '42':
+            command['header'] = bytes((0xf7, device_id, device_subid, message_flag, 0x01))
+            command['build'] = self._build_value_command
+        else:
+            command['header'] = bytes((0xf7, device_id, device_subid, message_flag, 0x00))
+            command['build'] = self._build_default_command
 
-    def parse_payload(self, payload_dict: Dict[str, str], root_topic: str) -> Dict[str, Any]:
-        """Parse incoming payload and return topic-value pairs."""
+    def parse_payload(self, payload_dict: Dict[str, str]) -> Dict[str, Any]:
+        """Parse incoming payload and return topic-value pairs.
+
+        Topics are the strings precomputed at registration.
+        """
         result = {}
+        data = payload_dict['data']
         
-        for status in self.status_messages[payload_dict['message_flag']]:
-            parse_status = re.match(status['regex'], payload_dict['data'])
+        for status in self.status_messages.get(payload_dict['message_flag'], ()):
+            parse_status = status['pattern'].match(data)
             
             if not parse_status:
                 continue
-                
-            if len(self.child_devices) > 0:
-                for index, child_device in enumerate(self.child_devices):
-                    topic = f"{root_topic}/{self.device_class}/{child_device}{self.device_name}/{status['attr_name']}"
-                    
-                    # Special handling for climate power and away_mode with bit operations
-                    if (status['attr_name'] in ["power", "away_mode"] and 
-                        self.device_class == "climate"):
-                        # 원본과 동일: 비트 연산 결과를 정수로 process_func에 전달
-                        result[topic] = status['process_func'](
-                            int(parse_status.group(1), 16) & (1 << index)
-                        )
-                    else:
-                        result[topic] = status['process_func'](parse_status.group(index + 1))
+            
+            if status['is_climate_bitfield']:
+                # 원본과 동일한 결과: process_func(bits & mask)를 미리 계산한 값에서 선택
+                bits = int(parse_status.group(1), 16)
+                for topic, mask, values in zip(status['topics'], self._child_masks, status['bit_values']):
+                    result[topic] = values[(bits & mask) != 0]
             else:
-                topic = f"{root_topic}/{self.device_class}/{self.device_name}/{status['attr_name']}"
-                result[topic] = status['process_func'](parse_status.group(1))
+                process_func = status['process_func']
+                for index, topic in enumerate(status['topics']):
+                    result[topic] = process_func(parse_status.group(index + 1))
                 
         return result
 
@@ -102,40 +180,53 @@ class Device:
         child_name: Optional[str] = None
     ) -> bytes:
         """Generate command payload for this device."""
-        from protocol_utils import ProtocolUtils
-        
-        attr_value = self.command_messages[attr_name]['process_func'](attr_value)
-        
+        command = self.command_messages[attr_name]
+        attr_value = command['process_func'](attr_value)
         if child_name is not None:
-            idx = [child + self.device_name for child in self.child_devices].index(child_name)
-            command_payload = [
-                'f7', self.device_id, self.command_messages[attr_name]['controll_id'][idx],
-                self.command_messages[attr_name]['message_flag'], '01', attr_value
-            ]
-        # Special handling for elevator
-        elif self.device_id == '33' and self.command_messages[attr_name]['message_flag'] == '81':
-            command_payload = [
-                'f7', self.device_id, self.device_subid,
-                self.command_messages[attr_name]['message_flag'], '03', '00', attr_value, '00'
-            ]
+            command_payload = self._build_child_command(command, attr_value, child_name)
         else:
-            # 환풍기 percentage 명령은 특별한 형식 사용
-            if (self.device_id == '32' and 
-                self.command_messages[attr_name]['message_flag'] == '42'):
-                command_payload = [
-                    'f7', self.device_id, self.device_subid,
-                    self.command_messages[attr_name]['message_flag'], '01', attr_value
-                ]
-            else:
-                command_payload = [
-                    'f7', self.device_id, self.device_subid,
-                    self.command_messages[attr_name]['message_flag'], '00'
-                ]
+            command_payload = command['build'](command, attr_value, child_name)
         
-        command_payload.append(ProtocolUtils.xor(command_payload))
-        command_payload.append(ProtocolUtils.add(command_payload))
-        
-        return bytes(bytearray.fromhex(' '.join(command_payload)))
+        return ProtocolUtils.with_checksum(command_payload)
+
+    def _build_child_command(
+        self,
+        command: Dict[str, Any],
+        attr_value: str,
+        child_name: Optional[str]
+    ) -> bytes:
+        """Build a frame addressed to a child device by its control ID."""
+        idx = self._child_name_to_idx.get(child_name)
+        if idx is None:
+            raise ValueError(f"Unknown child device {child_name!r} for {self.device_name}")
+        return command['headers'][idx] + bytes.fromhex(attr_value)
+
+    def _build_elevator_command(
+        self,
+        command: Dict[str, Any],
+        attr_value: str,
+        child_name: Optional[str]
+    ) -> bytes:
+        """Build an elevator call frame."""
+        return command['header'] + bytes.fromhex(attr_value) + b'\x00'
+
+    def _build_value_command(
+        self,
+        command: Dict[str, Any],
+        attr_value: str,
+        child_name: Optional[str]
+    ) -> bytes:
+        """Build a frame carrying a single value byte."""
+        return command['header'] + bytes.fromhex(attr_value)
+
+    def _build_default_command(
+        self,
+        command: Dict[str, Any],
+        attr_value: str,
+        child_name: Optional[str]
+    ) -> bytes:
+        """Build a frame with an empty data section."""
+        return command['header']
 
     def get_mqtt_discovery_payload(
         self,
@@ -143,6 +234,10 @@ class Device:
         homeassistant_root_topic: str
     ) -> List[Tuple[str, str]]:
         """Generate MQTT discovery payloads for Home Assistant."""
+        cache_key = (root_topic, homeassistant_root_topic)
+        if self._discovery_cache is not None and self._discovery_cache_key == cache_key:
+            return self._discovery_cache
+        
         discovery_list = []
         
         if len(self.child_devices) > 0:
@@ -192,13 +287,15 @@ class Device:
                 'name': self.device_name
             }
             discovery_list.append((topic, json_dumps(result, ensure_ascii=False)))
-            
+        
+        self._discovery_cache = discovery_list
+        self._discovery_cache_key = cache_key
         return discovery_list
     
     def get_status_attr_list(self) -> List[str]:
         """Get list of all status attribute names for this device."""
-        return list(set(
-            status['attr_name'] 
-            for status_list in self.status_messages.values() 
+        return list({
+            status['attr_name']: None
+            for status_list in self.status_messages.values()
             for status in status_list
-        ))
\ No newline at end of file
+        })
\ No newline at end of file
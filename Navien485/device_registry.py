@@ -1,9 +1,48 @@
-import json
 import os
+from functools import lru_cache, partial
 from typing import Dict, Any
+from config_manager import load_json
 from wallpad import Wallpad
 
 
+# Status regexes restrict the captured values to these keys, so a dict
+# lookup replaces the equivalent two-way lambda on the parse hot path.
+_ON_OFF_01 = {'01': 'ON', '00': 'OFF'}
+_ON_OFF_02 = {'02': 'ON', '00': 'OFF'}
+_hex_to_int = partial(int, base=16)
+
+# 정수 percentage(0~100) -> 단계: 0 = OFF, 1~35 = 1단계, 36~70 = 2단계, 71~100 = 3단계
+_PCT_TABLE = bytes([0] + [1] * 35 + [2] * 35 + [3] * 30)
+
+
+@lru_cache(maxsize=256)
+def _convert_percentage_to_hex(v: str) -> str:
+    """
+    환풍기 percentage를 RS485 hex로 변환
+    직접 값 (1, 2, 3) 및 Home Assistant percentage (0, 33, 66, 100) 지원
+    """
+    # 먼저 직접 매핑 시도 (1, 2, 3)
+    direct_mapping = {'0': '00', '1': '01', '2': '02', '3': '03'}
+    if v in direct_mapping:
+        return direct_mapping[v]
+    
+    # 그 다음 percentage 범위 처리 (33, 66, 100)
+    try:
+        num_val = float(v)
+    except (ValueError, TypeError):
+        return '01'
+    
+    if num_val.is_integer() and 0 <= num_val <= 100:
+        return f'{_PCT_TABLE[int(num_val)]:02x}'
+    # 소수 percentage는 기존 범위 규칙을 그대로 따름
+    elif 36 <= num_val <= 70:
+        return '02'  # 2단계 (중)
+    elif 71 <= num_val <= 100:
+        return '03'  # 3단계 (강)
+    else:
+        return '01'  # 기본값
+
+
 class DeviceRegistry:
     """Registry for configuring and registering all devices."""
     
@@ -12,8 +51,7 @@ class DeviceRegistry:
         if config_path is None:
             config_path = os.path.join(os.path.dirname(__file__), 'config.json')
         
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
+        self.config = load_json(config_path)
         
         self.devices_config = self.config.get('devices', {})
         self.room_templates = self.config.get('room_templates', {})
@@ -22,34 +60,6 @@ class DeviceRegistry:
             'oscillation': {'03': 'oscillate_on', '00': 'oscillation_off', '01': 'oscillate_off'}
         }
     
-    def _convert_percentage_to_hex(self, v: str) -> str:
-        """
-        환풍기 percentage를 RS485 hex로 변환
-        직접 값 (1, 2, 3) 및 Home Assistant percentage (0, 33, 66, 100) 지원
-        """
-        # 먼저 직접 매핑 시도 (1, 2, 3)
-        direct_mapping = {'0': '00', '1': '01', '2': '02', '3': '03'}
-        if str(v) in direct_mapping:
-            return direct_mapping[str(v)]
-        
-        # 그 다음 percentage 범위 처리 (33, 66, 100)
-        try:
-            num_val = float(v)
-            
-            if num_val == 0:
-                return '00'  # OFF
-            elif 1 <= num_val <= 35:  # 33% 범위
-                return '01'  # 1단계 (약)
-            elif 36 <= num_val <= 70:  # 66% 범위  
-                return '02'  # 2단계 (중)
-            elif 71 <= num_val <= 100:  # 100% 범위
-                return '03'  # 3단계 (강)
-            else:
-                return '01'  # 기본값
-                
-        except (ValueError, TypeError):
-            return '01'
-    
     def _generate_child_devices(self, config: Dict[str, Any]) -> tuple:
         """Generate child devices and control IDs based on room configuration."""
         room_config = config.get('room_config', {})
@@ -98,6 +108,8 @@ class DeviceRegistry:
                 self._register_heating(device_config)
             elif device_key == 'elevator':
                 self._register_elevator(device_config)
+        
+        self.wallpad.finalize()
     
     def _register_heat_exchanger(self, config: Dict[str, Any]) -> None:
         """Register heat exchanger (전열교환기) device."""
@@ -127,7 +139,7 @@ class DeviceRegistry:
             attr_name='power',
             topic_class='state_topic',
             regex=r'00(0[01])0[0-3]0[013]00',
-            process_func=lambda v: 'ON' if v == '01' else 'OFF'
+            process_func=_ON_OFF_01.get
         )
         
         device.register_status(
@@ -135,7 +147,7 @@ class DeviceRegistry:
             attr_name='percentage',
             topic_class='percentage_state_topic',
             regex=r'000[01](0[0-3])0[013]00',
-            process_func=lambda v: self._packet_mappings['percentage'][v]
+            process_func=self._packet_mappings['percentage'].__getitem__
         )
         
         # Command messages
@@ -150,7 +162,7 @@ class DeviceRegistry:
             message_flag='42',
             attr_name='percentage',
             topic_class='percentage_command_topic',
-            process_func=self._convert_percentage_to_hex
+            process_func=_convert_percentage_to_hex
         )
     
     def _register_gas_valve(self, config: Dict[str, Any]) -> None:
@@ -176,7 +188,7 @@ class DeviceRegistry:
             attr_name='power',
             topic_class='state_topic',
             regex=r'0(0[02])0',
-            process_func=lambda v: 'ON' if v == '02' else 'OFF'
+            process_func=_ON_OFF_02.get
         )
         
         device.register_command(
@@ -204,7 +216,7 @@ class DeviceRegistry:
             attr_name='power',
             topic_class='state_topic',
             regex=r'0[01](0[01])(0[01])',
-            process_func=lambda v: 'ON' if v == '01' else 'OFF'
+            process_func=_ON_OFF_01.get
         )
         
         device.register_command(
@@ -228,39 +240,39 @@ class DeviceRegistry:
             optional_info=config.get('optional_info', {})
         )
         
-        # Status messages for different message flags
-        for message_flag in ['81', '01']:
-            device.register_status(
-                message_flag=message_flag,
-                attr_name='power',
-                topic_class='mode_state_topic',
-                regex=r'00([0-9a-fA-F]{2})[0-9a-fA-F]{18}',
-                process_func=lambda v: 'heat' if v != 0 else 'off'
-            )
-            
-            device.register_status(
-                message_flag=message_flag,
-                attr_name='away_mode',
-                topic_class='away_mode_state_topic',
-                regex=r'00[0-9a-fA-F]{2}([0-9a-fA-F]{2})[0-9a-fA-F]{16}',
-                process_func=lambda v: 'ON' if v != 0 else 'OFF'
-            )
-            
-            device.register_status(
-                message_flag=message_flag,
-                attr_name='currenttemp',
-                topic_class='current_temperature_topic',
-                regex=r'00[0-9a-fA-F]{10}([0-9a-fA-F]{2})[0-9a-fA-F]{2}([0-9a-fA-F]{2})[0-9a-fA-F]{2}([0-9a-fA-F]{2})',
-                process_func=lambda v: int(v, 16)
-            )
-            
-            device.register_status(
-                message_flag=message_flag,
-                attr_name='targettemp',
-                topic_class='temperature_state_topic',
-                regex=r'00[0-9a-fA-F]{8}([0-9a-fA-F]{2})[0-9a-fA-F]{2}([0-9a-fA-F]{2})[0-9a-fA-F]{2}([0-9a-fA-F]{2})[0-9a-fA-F]{2}',
-                process_func=lambda v: int(v, 16)
-            )
+        # Status messages shared by both message flags
+        status_flags = ['81', '01']
+        device.register_status_for_flags(
+            message_flags=status_flags,
+            attr_name='power',
+            topic_class='mode_state_topic',
+            regex=r'00([0-9a-fA-F]{2})[0-9a-fA-F]{18}',
+            process_func=lambda v: 'heat' if v != 0 else 'off'
+        )
+        
+        device.register_status_for_flags(
+            message_flags=status_flags,
+            attr_name='away_mode',
+            topic_class='away_mode_state_topic',
+            regex=r'00[0-9a-fA-F]{2}([0-9a-fA-F]{2})[0-9a-fA-F]{16}',
+            process_func=lambda v: 'ON' if v != 0 else 'OFF'
+        )
+        
+        device.register_status_for_flags(
+            message_flags=status_flags,
+            attr_name='currenttemp',
+            topic_class='current_temperature_topic',
+            regex=r'00[0-9a-fA-F]{10}([0-9a-fA-F]{2})[0-9a-fA-F]{2}([0-9a-fA-F]{2})[0-9a-fA-F]{2}([0-9a-fA-F]{2})',
+            process_func=_hex_to_int
+        )
+        
+        device.register_status_for_flags(
+            message_flags=status_flags,
+            attr_name='targettemp',
+            topic_class='temperature_state_topic',
+            regex=r'00[0-9a-fA-F]{8}([0-9a-fA-F]{2})[0-9a-fA-F]{2}([0-9a-fA-F]{2})[0-9a-fA-F]{2}([0-9a-fA-F]{2})[0-9a-fA-F]{2}',
+            process_func=_hex_to_int
+        )
         
         # Command messages
         default_control_ids = ['11', '12', '13']
@@ -304,7 +316,7 @@ class DeviceRegistry:
             attr_name='floor',
             topic_class='current_floor_state_topic',  # 기존과 동일
             regex=r'01([0-9a-fA-F]{2})',  # 01 다음의 층수 바이트만 추출
-            process_func=lambda v: int(v, 16)
+            process_func=_hex_to_int
         )
         
         # 스위치 상태 (기존 호환성)
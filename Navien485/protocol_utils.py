@@ -1,49 +1,97 @@
-import re
+import operator
 from functools import reduce
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
+
+
+# Device IDs handled by this bridge, as they appear in a hex payload.
+_DEVICE_IDS = frozenset(('0e', '12', '32', '33', '36'))
+_DEVICE_ID_BYTES = frozenset(int(device_id, 16) for device_id in _DEVICE_IDS)
+_HEX_DIGITS = frozenset('0123456789abcdef')
+# f7 + device_id + device_subid + message_flag + length + xor + add
+_MIN_FRAME_LEN = 7
+_MIN_PAYLOAD_HEX_LEN = 2 * _MIN_FRAME_LEN
+
+
+_ByteLike = Union[bytes, bytearray, memoryview]
+
+
+def _as_bytes(data: Union[List[str], _ByteLike]) -> _ByteLike:
+    """Return ``data`` as a byte sequence, decoding a list of hex tokens if needed.
+
+    Each token is parsed with ``int(token, 16)`` as before, so ``'7'`` and
+    ``'07'`` are the same byte; a token above ``ff`` raises ``ValueError``.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return data
+    return bytes(int(token, 16) for token in data)
 
 
 class ProtocolUtils:
     """Utilities for RS485 protocol handling."""
     
     @staticmethod
-    def xor(hexstring_array: List[str]) -> str:
-        """Calculate XOR checksum for hexadecimal string array."""
-        return format(
-            reduce(lambda x, y: x ^ y, map(lambda x: int(x, 16), hexstring_array)), 
-            '02x'
-        )
+    def xor(hexstring_array: Union[List[str], _ByteLike]) -> str:
+        """Calculate XOR checksum for hexadecimal string array or bytes.
+
+        Not used by this package, which builds frames with ``with_checksum``.
+        """
+        return format(reduce(operator.xor, _as_bytes(hexstring_array)), '02x')
 
     @staticmethod
-    def add(hexstring_array: List[str]) -> str:
-        """Calculate ADD checksum for hexadecimal string array."""
-        return format(
-            reduce(lambda x, y: x + y, map(lambda x: int(x, 16), hexstring_array)), 
-            '02x'
-        )[-2:]
+    def add(hexstring_array: Union[List[str], _ByteLike]) -> str:
+        """Calculate ADD checksum for hexadecimal string array or bytes.
+
+        Not used by this package, which builds frames with ``with_checksum``.
+        """
+        return format(sum(_as_bytes(hexstring_array)) & 0xFF, '02x')
+
+    @staticmethod
+    def with_checksum(frame: bytes) -> bytes:
+        """Return ``frame`` followed by its XOR and ADD checksum bytes."""
+        xor_val = reduce(operator.xor, frame)
+        return frame + bytes((xor_val, (sum(frame) + xor_val) & 0xFF))
+
+    @staticmethod
+    def is_candidate_frame(frame: bytes) -> bool:
+        """Cheap length and device ID check on raw frame bytes, before hex conversion.
+
+        Frames rejected here would also fail ``is_valid`` or ``parse_payload``.
+        """
+        return (
+            len(frame) >= _MIN_FRAME_LEN and
+            frame[1] in _DEVICE_ID_BYTES and
+            frame[4] + 7 == len(frame)
+        )
 
     @staticmethod
     def is_valid(payload_hexstring: str) -> bool:
         """Validate RS485 payload using checksums."""
-        payload_array = [payload_hexstring[i:i+2] for i in range(0, len(payload_hexstring), 2)]
-        
         try:
-            length_valid = int(payload_array[4], 16) + 7 == len(payload_array)
-            xor_valid = ProtocolUtils.xor(payload_array[:-2]) == payload_array[-2:-1][0]
-            add_valid = ProtocolUtils.add(payload_array[:-1]) == payload_array[-1:][0]
+            buf = bytes.fromhex(payload_hexstring)
+            if buf[4] + 7 != len(buf):
+                return False
             
-            return length_valid and xor_valid and add_valid
+            body = buf[:-2]
+            xor_val = reduce(operator.xor, body)
+            return xor_val == buf[-2] and (sum(body) + xor_val) & 0xFF == buf[-1]
         except (ValueError, IndexError):
             return False
 
     @staticmethod
     def parse_payload(payload_hexstring: str) -> Optional[Dict[str, str]]:
         """Parse RS485 payload into components."""
-        pattern = (
-            r'f7(?P<device_id>0e|12|32|33|36)(?P<device_subid>[0-9a-f]{2})'
-            r'(?P<message_flag>[0-9a-f]{2})(?:[0-9a-f]{2})'
-            r'(?P<data>[0-9a-f]*)(?P<xor>[0-9a-f]{2})(?P<add>[0-9a-f]{2})'
-        )
+        # Fixed positions: f7 | id | subid | flag | length | data... | xor | add
+        if (len(payload_hexstring) < _MIN_PAYLOAD_HEX_LEN or
+                not payload_hexstring.startswith('f7') or
+                payload_hexstring[2:4] not in _DEVICE_IDS or
+                not _HEX_DIGITS.issuperset(payload_hexstring)):
+            return None
         
-        match = re.match(pattern, payload_hexstring)
-        return match.groupdict() if match else None
\ No newline at end of file
+        return {
+            'device_id': payload_hexstring[2:4],
+            'device_subid': payload_hexstring[4:6],
+            'message_flag': payload_hexstring[6:8],
+            'data': payload_hexstring[10:-4],
+            'xor': payload_hexstring[-4:-2],
+            'add': payload_hexstring[-2:],
+        }
\ No newline at end of file
@@ -1,6 +1,8 @@
 from datetime import datetime
+import logging
+import socket
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 import paho.mqtt.client as mqtt
 
 from config_manager import ConfigManager
@@ -9,20 +11,67 @@ from protocol_utils import ProtocolUtils
 from logger import setup_logger
 
 
+def _split_command_topic(topic: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Split ``{root}/{class}/{device}/{attr}/{action}`` into device, attr and action.
+
+    Missing segments are returned as ``None``; anything after the action is ignored.
+    """
+    parts = topic.split('/', 5)
+    parts.extend([None] * (5 - len(parts)))
+    return parts[2], parts[3], parts[4]
+
+
+# 명령 재작성이 필요한 장치 이름
+_HEAT_EXCHANGER = "전열교환기"
+
+# QoS 1/2 메시지 동시 전송 한도 (paho 기본값 20)
+MQTT_MAX_INFLIGHT = 200
+
+# /dev/error 토픽 최소 발행 간격(초): 손상된 프레임이 연속될 때 브로커 폭주 방지
+ERROR_PUBLISH_INTERVAL = 1.0
+
+
 class Wallpad:
     """Main controller for Navien Wallpad RS485 to MQTT bridge."""
     
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager
         self._device_list: List[Device] = []
+        self._by_ids: Dict[Tuple[str, str], Device] = {}
+        self._by_name: Dict[str, Device] = {}
         self.logger = setup_logger(f"{__name__}.Wallpad")
+        self._last_error_publish_ts = 0.0
+        # 경고를 이미 남긴 미등록 (device_id, device_subid)
+        self._unknown_device_ids: Set[Tuple[str, str]] = set()
+        
+        # 고정 토픽은 한 번만 생성
+        self._raw_topic = f"{self.config.root_topic}/dev/raw"
+        self._cmd_topic = f"{self.config.root_topic}/dev/command"
+        self._error_topic = f"{self.config.root_topic}/dev/error"
+        # 토픽별 처리기, 등록되지 않은 토픽은 명령으로 처리
+        self._topic_handlers = {self._raw_topic: self._process_raw_message}
+        # 장치별 '/set' 명령 재작성기: 새 장치는 여기에 항목만 추가
+        self._command_rewriters = {_HEAT_EXCHANGER: self._rewrite_heat_exchanger_command}
+        # finalize()에서 채움
+        self._subscription_topics: Optional[List[str]] = None
+        self._discovery_msgs: List[Tuple[str, str]] = []
+        # (device_class, device_name, child_name, attr_name), finalize()에서 채움
+        self._flat_device_entries: List[Tuple[str, str, str, str]] = []
+        
         self._setup_mqtt_client()
     
     def _setup_mqtt_client(self) -> None:
         """Initialize and configure MQTT client."""
         self.mqtt_client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        self.mqtt_client.on_connect = self._on_connect
         self.mqtt_client.on_message = self._on_raw_message
         self.mqtt_client.on_disconnect = self._on_disconnect
+        self.mqtt_client.on_socket_open = self._on_socket_open
+        
+        self.mqtt_client.max_inflight_messages_set(MQTT_MAX_INFLIGHT)
+        self.mqtt_client.max_queued_messages_set(0)  # 0 = 무제한
+        # 재연결은 loop_forever()가 이 지수 백오프로 처리
+        self.mqtt_client.reconnect_delay_set(min_delay=1, max_delay=60)
         
         if self.config.mqtt_username or self.config.mqtt_password:
             self.mqtt_client.username_pw_set(
@@ -33,6 +82,11 @@ class Wallpad:
         self.mqtt_client.connect(self.config.mqtt_server, self.config.mqtt_port)
         self.logger.info(f"Connected to MQTT broker at {self.config.mqtt_server}:{self.config.mqtt_port}")
 
+    def _on_socket_open(self, client: mqtt.Client, userdata: Any, sock: Any) -> None:
+        """Disable Nagle so small status frames are sent immediately."""
+        if isinstance(sock, socket.socket):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
     def add_device(
         self,
         device_name: str,
@@ -46,72 +100,129 @@ class Wallpad:
         """Add a new device to the wallpad."""
         device = Device(
             device_name, device_id, device_subid, device_class,
-            child_devices or [], mqtt_discovery, optional_info or {}
+            child_devices or [], mqtt_discovery, optional_info or {},
+            root_topic=self.config.root_topic
         )
         self._device_list.append(device)
+        # 구독 토픽/디스커버리 캐시를 무효화: 다음 연결 때 finalize()로 다시 생성
+        self._subscription_topics = None
+        
+        # 먼저 등록된 장치가 우선 (기존 선형 탐색과 동일)
+        self._by_ids.setdefault((device_id, device_subid), device)
+        self._by_name.setdefault(device_name, device)
+        for child in device.child_devices:
+            self._by_name.setdefault(child + device_name, device)
         return device
 
-    def get_device(self, **kwargs) -> Device:
-        """Find device by name or ID."""
+    def finalize(self) -> None:
+        """Precompute the subscription topics and discovery messages.
+
+        They are sent on every (re)connect without being rebuilt. ``add_device``
+        invalidates them so new devices are picked up on the next connect;
+        call this again after registering more statuses on existing devices.
+        """
+        # 상태 등록이 끝난 뒤에야 속성 목록이 확정되므로 여기서 캐시
+        self._flat_device_entries = [
+            (device.device_class, device.device_name, child_name, attr_name)
+            for device in self._device_list
+            for child_name in (device.child_devices or [""])
+            for attr_name in device.get_status_attr_list()
+        ]
+        
+        self._subscription_topics = self._get_subscription_topics()
+        self._discovery_msgs = [
+            msg
+            for device in self._device_list if device.mqtt_discovery
+            for msg in device.get_mqtt_discovery_payload(
+                self.config.root_topic,
+                self.config.homeassistant_root_topic
+            )
+        ]
+
+    def get_device_or_none(self, **kwargs) -> Optional[Device]:
+        """Find device by name or ID, returning None if there is no match."""
         device_name = kwargs.get('device_name')
+        if device_name:
+            return self._by_name.get(device_name)
+        
         device_id = kwargs.get('device_id')
         device_subid = kwargs.get('device_subid')
-        
-        for device in self._device_list:
-            if device_name:
-                if (device.device_name == device_name or 
-                    device_name in [child + device.device_name for child in device.child_devices]):
-                    return device
-            elif device_id and device_subid:
-                if device.device_id == device_id and device.device_subid == device_subid:
-                    return device
-        
+        if device_id and device_subid:
+            return self._by_ids.get((device_id, device_subid))
+        return None
+
+    def get_device(self, **kwargs) -> Device:
+        """Find device by name or ID."""
+        device = self.get_device_or_none(**kwargs)
+        if device is not None:
+            return device
         raise ValueError(f"Device not found with criteria: {kwargs}")
 
     def _get_subscription_topics(self) -> List[str]:
         """Get list of MQTT topics to subscribe to."""
-        topics = [f"{self.config.root_topic}/dev/raw"]
-        
-        for device in self._device_list:
-            for child_name in (device.child_devices if device.child_devices else [""]):
-                for attr_name in device.get_status_attr_list():
-                    topic = f"{self.config.root_topic}/{device.device_class}/{child_name}{device.device_name}/{attr_name}/set"
-                    topics.append(topic)
-        
-        return topics
+        root_topic = self.config.root_topic
+        return [self._raw_topic] + [
+            f"{root_topic}/{device_class}/{child_name}{device_name}/{attr_name}/set"
+            for device_class, device_name, child_name, attr_name in self._flat_device_entries
+        ]
 
     def _register_mqtt_discovery(self) -> None:
         """Register devices with Home Assistant via MQTT discovery."""
-        for device in self._device_list:
-            if device.mqtt_discovery:
-                for topic, payload in device.get_mqtt_discovery_payload(
-                    self.config.root_topic, 
-                    self.config.homeassistant_root_topic
-                ):
-                    self.mqtt_client.publish(topic, payload, qos=2, retain=True)
+        for topic, payload in self._discovery_msgs:
+            self.mqtt_client.publish(topic, payload, qos=2, retain=True)
 
     def listen(self) -> None:
         """Start listening for MQTT messages."""
+        self._ensure_finalized()
+        self.mqtt_client.loop_forever()
+
+    def _ensure_finalized(self) -> None:
+        """Rebuild the finalize() caches if a device was added since the last run."""
+        if self._subscription_topics is None:
+            self.finalize()
+
+    def _on_connect(
+        self,
+        client: mqtt.Client,
+        userdata: Any,
+        flags: Any,
+        reason_code: Any,
+        properties: Any = None
+    ) -> None:
+        """Send discovery and (re)subscribe on every successful connect."""
+        if reason_code.is_failure:
+            self.logger.error("MQTT connection refused (rc=%s)", reason_code)
+            return
+        
+        self._ensure_finalized()
         self._register_mqtt_discovery()
         
-        subscription_topics = self._get_subscription_topics()
-        for topic in subscription_topics:
-            self.logger.debug(f"Subscribing to: {topic}")
+        subscription_topics = self._subscription_topics
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Subscribing to %d topics: %s", len(subscription_topics), subscription_topics
+            )
         
-        self.mqtt_client.subscribe([(topic, 2) for topic in subscription_topics])
-        self.mqtt_client.loop_forever()
+        client.subscribe([(topic, 2) for topic in subscription_topics])
 
     def _on_raw_message(self, client: mqtt.Client, userdata: Any, msg: mqtt.MQTTMessage) -> None:
         """Handle incoming MQTT messages."""
-        if msg.topic == f"{self.config.root_topic}/dev/raw":
-            self._process_raw_message(client, msg)
-        else:
-            self._process_command_message(client, msg)
+        handler = self._topic_handlers.get(msg.topic, self._process_command_message)
+        handler(client, msg)
 
     def _process_raw_message(self, client: mqtt.Client, msg: mqtt.MQTTMessage) -> None:
         """Process raw RS485 messages."""
-        for payload_raw_bytes in msg.payload.split(b'\xf7')[1:]:
-            payload_hexstring = 'f7' + payload_raw_bytes.hex()
+        # 0xf7 시작 바이트 기준으로 프레임을 잘라 복사 없이 순회
+        payload = msg.payload
+        view = memoryview(payload)
+        start = payload.find(b'\xf7')
+        while start != -1:
+            end = payload.find(b'\xf7', start + 1)
+            frame = view[start:end] if end != -1 else view[start:]
+            start = end
+            if not ProtocolUtils.is_candidate_frame(frame):
+                continue
+            payload_hexstring = frame.hex()
             
             try:
                 if ProtocolUtils.is_valid(payload_hexstring):
@@ -121,69 +232,87 @@ class Wallpad:
                 else:
                     continue
             except Exception as e:
-                error_msg = f"Error processing payload {payload_hexstring}: {str(e)}"
-                self.logger.error(error_msg)
-                client.publish(f"{self.config.root_topic}/dev/error", error_msg, qos=1, retain=True)
+                self._report_error(client, "Error processing payload %s: %s", payload_hexstring, e)
 
     def _process_command_message(self, client: mqtt.Client, msg: mqtt.MQTTMessage) -> None:
         """Process command messages from MQTT."""
-        topic_parts = msg.topic.split('/')
+        device_name, attr_name, action = _split_command_topic(msg.topic)
         
         try:
+            if device_name is None or attr_name is None:
+                raise ValueError("expected {root}/{class}/{device}/{attr}/set")
+            payload_str = msg.payload.decode()
+            
             # Special handling for devices
-            if (len(topic_parts) >= 5 and topic_parts[4] == "set"):
-                device_name = topic_parts[2]
-                
-                # Heat exchanger special handling
-                if device_name == "전열교환기":
-                    # percentage 0 -> power OFF
-                    if (topic_parts[3] == "percentage" and msg.payload == b'0'):
-                        topic_parts[3] = "power"
-                        msg.payload = b'OFF'
-                    # power ON -> percentage 33% (1단계)
-                    elif (topic_parts[3] == "power" and msg.payload == b'ON'):
-                        topic_parts[3] = "percentage"
-                        msg.payload = b'1'
-            device = self.get_device(device_name=topic_parts[2])
+            if action == "set":
+                rewrite = self._command_rewriters.get(device_name)
+                if rewrite is not None:
+                    attr_name, payload_str = rewrite(attr_name, payload_str)
+            device = self.get_device(device_name=device_name)
             
-            if len(device.child_devices) > 0:
-                payload = device.get_command_payload(
-                    topic_parts[3], 
-                    msg.payload.decode(), 
-                    child_name=topic_parts[2]
-                )
-            else:
-                payload = device.get_command_payload(
-                    topic_parts[3], 
-                    msg.payload.decode()
-                )
+            payload = device.get_command_payload(
+                attr_name, 
+                payload_str, 
+                child_name=device_name if len(device.child_devices) > 0 else None
+            )
             
-            client.publish(f"{self.config.root_topic}/dev/command", payload, qos=2, retain=False)
+            client.publish(self._cmd_topic, payload, qos=2, retain=False)
             
         except (ValueError, IndexError, UnicodeDecodeError) as e:
-            error_msg = f"Error processing command {msg.topic}: {str(e)}"
-            self.logger.error(error_msg)
-            client.publish(f"{self.config.root_topic}/dev/error", error_msg, qos=1, retain=True)
+            self._report_error(client, "Error processing command %s: %s", msg.topic, e)
+
+    @staticmethod
+    def _rewrite_heat_exchanger_command(attr_name: str, payload: str) -> Tuple[str, str]:
+        """Heat exchanger special handling."""
+        # percentage 0 -> power OFF
+        if attr_name == "percentage" and payload == '0':
+            return "power", 'OFF'
+        # power ON -> percentage 33% (1단계)
+        if attr_name == "power" and payload == 'ON':
+            return "percentage", '1'
+        return attr_name, payload
 
     def _publish_device_payload(self, client: mqtt.Client, payload_dict: Dict[str, str]) -> None:
         """Publish device status to MQTT."""
-        try:
-            device = self.get_device(
-                device_id=payload_dict['device_id'], 
-                device_subid=payload_dict['device_subid']
-            )
-            
-            for topic, value in device.parse_payload(payload_dict, self.config.root_topic).items():
-                client.publish(topic, value, qos=1, retain=False)
-                
-        except ValueError as e:
-            self.logger.warning(f"Device not found for payload: {payload_dict}")
-
-    def _on_disconnect(self, client: mqtt.Client, userdata: Any, rc: int, properties=None, *args, **kwargs) -> None:
-        """Handle MQTT disconnection and attempt reconnection."""
-        self.logger.warning(f"Disconnected (rc={rc}), attempting to reconnect...")
-        try:
-            time.sleep(1)
-            client.reconnect()
-        except Exception as e:
-            self.logger.error(f"Reconnect failed: {e}")
\ No newline at end of file
+        device = self.get_device_or_none(
+            device_id=payload_dict['device_id'], 
+            device_subid=payload_dict['device_subid']
+        )
+        if device is None:
+            # 공유 버스에서는 같은 미등록 장치가 계속 수신되므로 한 번만 경고
+            device_ids = (payload_dict['device_id'], payload_dict['device_subid'])
+            if device_ids not in self._unknown_device_ids:
+                self._unknown_device_ids.add(device_ids)
+                self.logger.warning("Device not found for payload: %s", payload_dict)
+            return
+        
+        # paho 클라이언트에는 일괄 발행 API가 없으므로 프레임마다 바로 발행
+        publish = client.publish
+        for topic, value in device.parse_payload(payload_dict).items():
+            # 상태 값은 RS485 프레임마다 반복 수신되므로 QoS 0으로 충분
+            publish(topic, value, qos=0, retain=False)
+
+    def _report_error(self, client: mqtt.Client, msg_format: str, *args: Any) -> None:
+        """Log an error and publish it, at most once per ERROR_PUBLISH_INTERVAL.
+
+        The message is formatted lazily, only when it is actually published.
+        """
+        self.logger.error(msg_format, *args)
+        
+        now = time.monotonic()
+        if now - self._last_error_publish_ts < ERROR_PUBLISH_INTERVAL:
+            return
+        self._last_error_publish_ts = now
+        # retain 하지 않음: 지난 오류가 브로커에 남지 않도록
+        client.publish(self._error_topic, msg_format % args, qos=1, retain=False)
+
+    def _on_disconnect(
+        self,
+        client: mqtt.Client,
+        userdata: Any,
+        flags: Any,
+        reason_code: Any,
+        properties: Any = None
+    ) -> None:
+        """Log MQTT disconnection; loop_forever() reconnects with backoff."""
+        self.logger.warning("Disconnected (rc=%s), reconnecting with backoff...", reason_code)
\ No newline at end of file